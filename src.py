@@ -4,107 +4,223 @@ import sqlite3
 import hashlib
 import sys
 import csv
+import mmap
+import os
+from contextlib import closing, contextmanager
+from itertools import islice
+
+# CPython's built-in MD5 skips OpenSSL's EVP setup, which dominates for short words.
+try:
+    from _md5 import md5 as _md5
+except ImportError:
+    _md5 = hashlib.md5
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+_SQL_CREATE_TABLE = '''
+CREATE TABLE IF NOT EXISTS words (
+    hash BLOB PRIMARY KEY,
+    word BLOB NOT NULL UNIQUE,
+    seq INTEGER NOT NULL UNIQUE
+) WITHOUT ROWID
+'''
+_SQL_TABLE_INFO = 'PRAGMA table_info(words)'
+_SQL_RENAME_LEGACY = 'ALTER TABLE words RENAME TO words_legacy'
+_SQL_SELECT_LEGACY = 'SELECT word, hash, id FROM words_legacy'
+_SQL_MIGRATE_ROW = 'INSERT INTO words (word, hash, seq) VALUES (?, ?, ?)'
+_SQL_DROP_LEGACY = 'DROP TABLE words_legacy'
+_SQL_INSERT_IGNORE = 'INSERT OR IGNORE INTO words (word, hash, seq) VALUES (?, ?, (SELECT IFNULL(MAX(seq), 0) + 1 FROM words))'
+_SQL_DELETE = 'DELETE FROM words WHERE word = ?'
+_SQL_SEARCH_WORD = 'SELECT hash FROM words WHERE word = ?'
+_SQL_SEARCH_HASH = 'SELECT word FROM words WHERE hash = ?'
+_SQL_SEARCH_HASHES = 'SELECT hash, word FROM words WHERE hash IN ({})'
+_SQL_LIST_ALL = 'SELECT word, hash FROM words'
+_SQL_UPDATE = 'UPDATE words SET word = ?, hash = ? WHERE word = ? RETURNING word'
+_SQL_COUNT = 'SELECT COUNT(*) FROM words'
+_SQL_LONGEST = 'SELECT word FROM words ORDER BY LENGTH(CAST(word AS TEXT)) DESC LIMIT 1'
+_SQL_SHORTEST = 'SELECT word FROM words ORDER BY LENGTH(CAST(word AS TEXT)) ASC LIMIT 1'
+_SQL_MOST_RECENT = 'SELECT word FROM words ORDER BY seq DESC LIMIT 1'
 
 class Database:
+    BATCH_SIZE = 50_000
+    SEARCH_CHUNK_SIZE = 500
+
     HASH_FUNCTIONS = {
-        "md5": hashlib.md5,
+        "md5": _md5,
         "sha1": hashlib.sha1,
         "sha256": hashlib.sha256,
         "sha512": hashlib.sha512
     }
 
+    # xxh3 is not cryptographic: it keys words for deduplication only and cannot reverse MD5/SHA digests.
+    if xxhash:
+        HASH_FUNCTIONS["xxh3"] = xxhash.xxh3_64
+
+    PRAGMAS = (
+        "page_size = 8192",
+        "journal_mode = WAL",
+        "synchronous = NORMAL",
+        "cache_size = -16384",
+        "temp_store = MEMORY",
+        "mmap_size = 268435456"
+    )
+
     def __init__(self, db_name, hash_type="md5"):
         if hash_type not in self.HASH_FUNCTIONS:
             raise ValueError(f"Unsupported hash type: {hash_type}")
 
-        self.conn = sqlite3.connect(db_name)
-        self.cursor = self.conn.cursor()
+        self.db_name = db_name
+        self.in_memory = False
+        self.connect(db_name)
+        for pragma in self.PRAGMAS:
+            self.conn.execute(f'PRAGMA {pragma}')
         self.hash_type = hash_type
-        self.hash_function = self.HASH_FUNCTIONS[hash_type]
+        self.hash_function = hash_function = self.HASH_FUNCTIONS[hash_type]
+
+        def hash_word(word):
+            return hash_function(word).digest()
+
+        self.hash_word = hash_word
         self.setup_database()
 
-    def hash_word(self, word):
-        return self.hash_function(word.encode()).hexdigest()
+    def connect(self, db_name):
+        self.conn = sqlite3.connect(db_name, isolation_level=None, cached_statements=256)
+
+    def hash_batch(self, data):
+        hash_function = self.hash_function
+        return [hash_function(chunk).digest() for chunk in data]
+
+    def hash_pairs(self, words):
+        return list(zip(words, self.hash_batch(words)))
 
     def setup_database(self):
-        self.cursor.execute(f'''
-        CREATE TABLE IF NOT EXISTS words (
-            id INTEGER PRIMARY KEY,
-            word TEXT NOT NULL UNIQUE,
-            hash TEXT NOT NULL UNIQUE
-        )
-        ''')
-        self.conn.commit()
+        self.conn.execute(_SQL_CREATE_TABLE)
+        self.migrate_database()
+
+    def has_legacy_layout(self):
+        return any(column[1] == "id" for column in self.conn.execute(_SQL_TABLE_INFO))
+
+    def migrate_database(self):
+        if not self.has_legacy_layout():
+            return
+        with self.transaction():
+            if not self.has_legacy_layout():
+                return
+            self.conn.execute(_SQL_RENAME_LEGACY)
+            self.conn.execute(_SQL_CREATE_TABLE)
+            legacy_rows = self.conn.execute(_SQL_SELECT_LEGACY)
+            self.conn.executemany(_SQL_MIGRATE_ROW, (
+                (word.encode(), bytes.fromhex(hash_), id_) for word, hash_, id_ in legacy_rows
+            ))
+            self.conn.execute(_SQL_DROP_LEGACY)
 
     def insert_word(self, word):
-        word_hash = self.hash_word(word)
+        word = encode_word(word)
+        self.conn.execute(_SQL_INSERT_IGNORE, (word, self.hash_word(word)))
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
         try:
-            self.cursor.execute('''
-            INSERT INTO words (word, hash) VALUES (?, ?)
-            ''', (word, word_hash))
-            self.conn.commit()
-        except sqlite3.IntegrityError:
-            pass
+            yield self
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
     def delete_word(self, word):
-        self.cursor.execute('DELETE FROM words WHERE word = ?', (word,))
-        self.conn.commit()
+        self.conn.execute(_SQL_DELETE, (encode_word(word),))
 
     def search_word(self, word):
-        self.cursor.execute('SELECT hash FROM words WHERE word = ?', (word,))
-        return self.cursor.fetchone()
+        row = self.conn.execute(_SQL_SEARCH_WORD, (encode_word(word),)).fetchone()
+        return (row[0].hex(),) if row else None
 
     def search_hash(self, hash_value):
-        self.cursor.execute('SELECT word FROM words WHERE hash = ?', (hash_value,))
-        return self.cursor.fetchone()
+        try:
+            hash_value = bytes.fromhex(hash_value)
+        except ValueError:
+            return None
+        return self.conn.execute(_SQL_SEARCH_HASH, (hash_value,)).fetchone()
+
+    def search_hashes(self, hash_values):
+        digests = []
+        for hash_value in hash_values:
+            try:
+                digests.append(bytes.fromhex(hash_value))
+            except ValueError:
+                pass
+        for start in range(0, len(digests), self.SEARCH_CHUNK_SIZE):
+            chunk = digests[start:start + self.SEARCH_CHUNK_SIZE]
+            query = _SQL_SEARCH_HASHES.format(','.join('?' * len(chunk)))
+            for hash_, word in self.conn.execute(query, chunk):
+                yield hash_.hex(), word
 
     def list_all_words(self):
-        self.cursor.execute('SELECT word, hash FROM words')
-        return self.cursor.fetchall()
+        return [(word, hash_.hex()) for word, hash_ in self.conn.execute(_SQL_LIST_ALL)]
 
     def backup_database(self, backup_file):
         with sqlite3.connect(backup_file) as backup:
             self.conn.backup(backup)
 
+    def load_into_memory(self):
+        if self.in_memory:
+            return
+        disk = self.conn
+        self.connect(':memory:')
+        disk.backup(self.conn)
+        disk.close()
+        self.in_memory = True
+        self.dumped_changes = self.conn.total_changes
+
+    def dump_to_disk(self):
+        with closing(sqlite3.connect(self.db_name)) as disk:
+            self.conn.backup(disk)
+        self.dumped_changes = self.conn.total_changes
+
     def close(self):
+        if self.in_memory and self.conn.total_changes != self.dumped_changes:
+            self.dump_to_disk()
         self.conn.close()
 
     def update_word(self, old_word, new_word):
+        new_word = encode_word(new_word)
         new_hash = self.hash_word(new_word)
-        self.cursor.execute('''
-        UPDATE words SET word = ?, hash = ? WHERE word = ?
-        ''', (new_word, new_hash, old_word))
-        self.conn.commit()
+        rows = self.conn.execute(_SQL_UPDATE, (new_word, new_hash, encode_word(old_word))).fetchall()
+        return rows[0] if rows else None
 
     def batch_insert(self, words):
-        words_with_hash = [(word, self.hash_word(word)) for word in words]
-        self.cursor.executemany('''
-        INSERT OR IGNORE INTO words (word, hash) VALUES (?, ?)
-        ''', words_with_hash)
-        self.conn.commit()
+        self.bulk_load(words)
+
+    def bulk_load(self, words):
+        words = map(encode_word, words)
+        count = 0
+        with self.transaction():
+            while batch := list(islice(words, self.BATCH_SIZE)):
+                self.conn.executemany(_SQL_INSERT_IGNORE, self.hash_pairs(batch))
+                count += len(batch)
+        return count
 
     def export_to_csv(self, csv_filename):
-        with open(csv_filename, 'w', newline='') as file:
+        with open(csv_filename, 'w', newline='', buffering=1 << 20) as file:
             writer = csv.writer(file)
             writer.writerow(["Word", f"{self.hash_type.upper()} Hash"])
-            self.cursor.execute('SELECT word, hash FROM words')
-            writer.writerows(self.cursor.fetchall())
+            rows = self.conn.execute(_SQL_LIST_ALL)
+            writer.writerows((decode_word(word), hash_.hex()) for word, hash_ in rows)
 
     def get_word_count(self):
-        self.cursor.execute('SELECT COUNT(*) FROM words')
-        return self.cursor.fetchone()[0]
+        return self.conn.execute(_SQL_COUNT).fetchone()[0]
 
     def get_longest_word(self):
-        self.cursor.execute('SELECT word FROM words ORDER BY LENGTH(word) DESC LIMIT 1')
-        return self.cursor.fetchone()
+        return self.conn.execute(_SQL_LONGEST).fetchone()
 
     def get_shortest_word(self):
-        self.cursor.execute('SELECT word FROM words ORDER BY LENGTH(word) ASC LIMIT 1')
-        return self.cursor.fetchone()
+        return self.conn.execute(_SQL_SHORTEST).fetchone()
 
     def get_most_recent_word(self):
-        self.cursor.execute('SELECT word FROM words ORDER BY id DESC LIMIT 1')
-        return self.cursor.fetchone()
+        return self.conn.execute(_SQL_MOST_RECENT).fetchone()
 
     def __enter__(self):
         return self
@@ -112,19 +228,45 @@ class Database:
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
 
+def encode_word(word):
+    return word.encode() if isinstance(word, str) else word
+
+def decode_word(word):
+    return word.decode(errors="backslashreplace")
+
+def read_wordlist(filename):
+    with open(filename, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            lines = map(bytes.strip, iter(mapped.readline, b''))
+            yield from filter(None, lines)
+
 def process_file(db, filename):
-    with open(filename, 'r') as file:
-        words = [line.strip() for line in file if line.strip()]
-        for word in words:
-            db.insert_word(word)
-        print(f"Processed {len(words)} words from '{filename}'.")
+    seen = set()
+    words = (word for word in read_wordlist(filename) if not (word in seen or seen.add(word)))
+    count = db.bulk_load(words)
+    print(f"Processed {count} words from '{filename}'.")
+
+def lookup_hashes(db):
+    hash_values = input("Enter hashes separated by space: ").split()
+    found = dict(db.search_hashes(hash_values))
+    for hash_value in hash_values:
+        word = found.get(hash_value.lower())
+        print(f"{hash_value} - {decode_word(word) if word else None}")
+
+def rename_word(db):
+    old_word = input("Enter the old word: ").encode()
+    new_word = input("Enter the new word: ").encode()
+    if db.update_word(old_word, new_word) is None:
+        print(f"Word '{decode_word(old_word)}' not found.")
 
 def display_statistics(db):
     stats = {
         "Total words": db.get_word_count(),
-        "Longest word": db.get_longest_word()[0],
-        "Shortest word": db.get_shortest_word()[0],
-        "Most recent word": db.get_most_recent_word()[0]
+        "Longest word": decode_word(db.get_longest_word()[0]),
+        "Shortest word": decode_word(db.get_shortest_word()[0]),
+        "Most recent word": decode_word(db.get_most_recent_word()[0])
     }
     print("\n--- Statistics ---")
     for key, value in stats.items():
@@ -137,6 +279,8 @@ def main():
         "3": "sha256",
         "4": "sha512"
     }
+    if "xxh3" in Database.HASH_FUNCTIONS:
+        HASH_MAPPING["5"] = "xxh3"
     
     print("Choose your hash type:")
     for key, value in HASH_MAPPING.items():
@@ -147,15 +291,16 @@ def main():
 
     MENU_OPTIONS = {
         "1": ("Process a file", process_file),
-        "2": ("Delete a word", lambda db: db.delete_word(input("Enter the word to delete: "))),
-        "3": ("Search word to get hash", lambda db: print(db.search_word(input("Enter the word to search: ")))),
-        "4": ("Search hash to get word", lambda db: print(db.search_hash(input("Enter the hash to search: ")))),
-        "5": ("List all words", lambda db: [print(f"{word} - {hash_}") for word, hash_ in db.list_all_words()]),
+        "2": ("Delete a word", lambda db: db.delete_word(input("Enter the word to delete: ").encode())),
+        "3": ("Search word to get hash", lambda db: print(db.search_word(input("Enter the word to search: ").encode()))),
+        "4": ("Search hashes to get words", lookup_hashes),
+        "5": ("List all words", lambda db: [print(f"{decode_word(word)} - {hash_}") for word, hash_ in db.list_all_words()]),
         "6": ("Backup database", lambda db: db.backup_database(input("Enter the backup filename: "))),
-        "7": ("Batch insert words", lambda db: db.batch_insert(input("Enter words separated by space: ").split())),
-        "8": ("Update word", lambda db: db.update_word(input("Enter the old word: "), input("Enter the new word: "))),
+        "7": ("Batch insert words", lambda db: db.batch_insert(input("Enter words separated by space: ").encode().split())),
+        "8": ("Update word", rename_word),
         "9": ("Display word count", lambda db: print(f"There are {db.get_word_count()} words in the database.")),
         "10": ("Export to CSV", lambda db: db.export_to_csv(input("Enter the filename to export (with .csv extension): "))),
+        "11": ("Load database into memory", lambda db: db.load_into_memory()),
         "12": ("Display statistics", display_statistics),
         "13": ("Exit", None)
     }